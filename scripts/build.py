@@ -4,14 +4,28 @@ Build script for Tech Insights news aggregator.
 Fetches RSS feeds, filters stories, and generates a static HTML page.
 """
 
+import heapq
 import html
 import json
+import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from functools import lru_cache
+from operator import attrgetter, itemgetter
 from pathlib import Path
 
 import feedparser
-from jinja2 import Environment, FileSystemLoader
+import httpx
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from selectolax.lexbor import LexborHTMLParser
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 SITE_URL = "https://aamar-shahzad.github.io/techInsights"
 
@@ -54,37 +68,117 @@ CATEGORY_LABELS = {
 }
 
 MAX_STORIES_PER_CATEGORY = 10
+# Feeds are independent and I/O-bound, so fetch them all at once.
+MAX_FETCH_WORKERS = 16
 MAX_DESCRIPTION_LENGTH = 200
+ARCHIVE_WINDOW_HOURS = 168
+MAX_ARCHIVE_STORIES = 50
+MAX_RSS_ITEMS = 30
 # Full article text from RSS (content/summary) embedded for on-device LLM context (not the live web page).
 # Large enough for typical full RSS bodies; still bounded so static HTML stays reasonable.
 MAX_LLM_BODY = 56000
 PROJECT_ROOT = Path(__file__).parent.parent
 TEMPLATES_DIR = PROJECT_ROOT / "templates"
 OUTPUT_DIR = PROJECT_ROOT / "docs"
+# ETag/Last-Modified validators and last-seen stories per feed URL, kept between builds.
+FEED_CACHE_FILE = PROJECT_ROOT / "cache" / "feeds.json"
+# Compiled Jinja2 templates, reused across builds alongside the feed cache.
+JINJA_CACHE_DIR = PROJECT_ROOT / "cache" / "jinja"
+
+
+@dataclass(slots=True)
+class Story:
+    """A single feed entry. Display fields are filled in once the story is selected."""
+
+    title: str
+    link: str
+    description: str
+    llm_body: str
+    source: str
+    date: datetime
+    hours_old: float
+    category: str = ""
+    category_label: str = ""
+    date_str: str = ""
+    time_ago: str = ""
+    is_new: bool = False
+
+
+# One pooled client for every feed: keep-alive and HTTP/2 avoid a new TCP/TLS handshake per request.
+HTTP_CLIENT = httpx.Client(
+    http2=True,
+    timeout=15,
+    follow_redirects=True,
+    headers={"User-Agent": "TechInsights/1.0 (+https://aamar-shahzad.github.io/techInsights/)"},
+)
+
+_print_lock = threading.Lock()
+
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+_BR_RE = re.compile(r"(?i)<\s*br\s*/?>")
+_P_CLOSE_RE = re.compile(r"(?i)</\s*p\s*>")
+_BLOCK_CLOSE_RE = re.compile(r"(?i)</\s*(div|h[1-6]|section|article|blockquote|table|tr|li)\s*>")
+_PARAGRAPH_SPLIT_RE = re.compile(r"\n\s*\n+")
+_LINE_WS_RE = re.compile(r"[\s\xa0]+")
+
+
+def log(message: str):
+    """Print a line without interleaving output from concurrent fetch workers."""
+    with _print_lock:
+        print(message)
+
+
+def json_dumps(obj, indent: bool = False) -> bytes:
+    """Serialize to UTF-8 JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+    return json.dumps(obj, indent=2 if indent else None).encode("utf-8")
+
+
+def json_loads(data: bytes):
+    """Parse JSON bytes, using orjson when it is installed."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+def write_atomic(path: Path, data: bytes):
+    """Write bytes via a sibling temp file so readers never see a half-written file."""
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(data)
+    os.replace(tmp, path)
+
 
+def render_to_file(template, path: Path, **context):
+    """Stream a template to path as UTF-8, swapping it into place atomically."""
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as f:
+        template.stream(**context).dump(f, encoding="utf-8")
+    os.replace(tmp, path)
 
+
+@lru_cache(maxsize=4096)
 def strip_html(text: str) -> str:
     """Remove HTML tags and decode entities."""
     if not text:
         return ""
-    text = re.sub(r"<[^>]+>", "", text)
-    text = html.unescape(text)
-    text = re.sub(r"\s+", " ", text).strip()
-    return text
+    text = LexborHTMLParser(text).text(separator="")
+    return _WS_RE.sub(" ", text).strip()
 
 
 def strip_html_for_article(text: str) -> str:
     """Strip tags but keep paragraph breaks so long RSS/HTML bodies stay readable for the LLM."""
     if not text:
         return ""
-    text = re.sub(r"(?i)<\s*br\s*/?>", "\n", text)
-    text = re.sub(r"(?i)</\s*p\s*>", "\n\n", text)
-    text = re.sub(r"(?i)</\s*(div|h[1-6]|section|article|blockquote|table|tr|li)\s*>", "\n", text)
-    text = re.sub(r"<[^>]+>", "", text)
+    text = _BR_RE.sub("\n", text)
+    text = _P_CLOSE_RE.sub("\n\n", text)
+    text = _BLOCK_CLOSE_RE.sub("\n", text)
+    text = _TAG_RE.sub("", text)
     text = html.unescape(text)
     paragraphs: list[str] = []
-    for block in re.split(r"\n\s*\n+", text):
-        line = re.sub(r"[\s\xa0]+", " ", block).strip()
+    for block in _PARAGRAPH_SPLIT_RE.split(text):
+        line = _LINE_WS_RE.sub(" ", block).strip()
         if line:
             paragraphs.append(line)
     return "\n\n".join(paragraphs)
@@ -127,112 +221,188 @@ def entry_llm_body(entry) -> str:
     return truncate(text, MAX_LLM_BODY)
 
 
-def time_ago(dt: datetime) -> str:
-    """Convert datetime to human-readable 'time ago' format."""
-    now = datetime.now(timezone.utc)
-    diff = now - dt
-    
-    seconds = diff.total_seconds()
-    if seconds < 0:
-        return "just now"
-    
-    minutes = seconds / 60
-    hours = minutes / 60
-    days = hours / 24
-    
+# (upper bound in seconds, seconds per unit, singular, plural), checked in order.
+_TIME_AGO_UNITS = (
+    (3600, 60, "min", "mins"),
+    (86400, 3600, "hour", "hours"),
+    (7 * 86400, 86400, "day", "days"),
+)
+
+
+def time_ago(dt: datetime, now: datetime) -> str:
+    """Convert datetime to human-readable 'time ago' format relative to now."""
+    seconds = int((now - dt).total_seconds())
     if seconds < 60:
         return "just now"
-    elif minutes < 60:
-        m = int(minutes)
-        return f"{m} min ago" if m == 1 else f"{m} mins ago"
-    elif hours < 24:
-        h = int(hours)
-        return f"{h} hour ago" if h == 1 else f"{h} hours ago"
-    elif days < 7:
-        d = int(days)
-        return f"{d} day ago" if d == 1 else f"{d} days ago"
-    else:
-        return dt.strftime("%b %d, %Y")
+
+    for threshold, divisor, singular, plural in _TIME_AGO_UNITS:
+        if seconds < threshold:
+            n = seconds // divisor
+            return f"{n} {singular if n == 1 else plural} ago"
+    return dt.strftime("%b %d, %Y")
 
 
 def parse_date(entry) -> datetime:
     """Extract published date from feed entry."""
-    if hasattr(entry, "published_parsed") and entry.published_parsed:
-        return datetime(*entry.published_parsed[:6], tzinfo=timezone.utc)
-    if hasattr(entry, "updated_parsed") and entry.updated_parsed:
-        return datetime(*entry.updated_parsed[:6], tzinfo=timezone.utc)
+    parsed = entry.get("published_parsed") or entry.get("updated_parsed")
+    if parsed:
+        return datetime(*parsed[:6], tzinfo=timezone.utc)
     return datetime.now(timezone.utc)
 
 
-def fetch_feed(source_name: str, url: str) -> list[dict]:
-    """Fetch and parse a single RSS feed."""
+def make_story(
+    title: str, link: str, description: str, llm_body: str, source_name: str, pub_date: datetime, now: datetime
+) -> Story:
+    """Build a Story; display fields are added later by format_story_dates."""
+    hours_old = (now - pub_date).total_seconds() / 3600
+    return Story(title, link, description, llm_body, source_name, pub_date, hours_old)
+
+
+def format_story_dates(stories: list[Story], now: datetime):
+    """Add date_str, time_ago and is_new; run only on stories that survive filtering."""
+    for story in stories:
+        story.date_str = story.date.strftime("%b %d, %Y")
+        story.time_ago = time_ago(story.date, now)
+        story.is_new = story.hours_old < 6
+
+
+def load_feed_cache() -> dict:
+    """Load cached ETag/Last-Modified validators and stories from the previous build."""
+    try:
+        return json_loads(FEED_CACHE_FILE.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_feed_cache(cache: dict):
+    """Persist feed validators and stories for conditional GETs on the next build."""
+    FEED_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(FEED_CACHE_FILE, json_dumps(cache))
+
+
+def cache_stories(stories: list[Story]) -> list[dict]:
+    """Reduce stories to the fields needed to rebuild them; dates become ISO strings."""
+    return [
+        {
+            "title": s.title,
+            "link": s.link,
+            "description": s.description,
+            "llm_body": s.llm_body,
+            "date": s.date.isoformat(),
+        }
+        for s in stories
+    ]
+
+
+def fetch_feed(source_name: str, url: str, now: datetime, cache: dict | None = None) -> list[Story]:
+    """Fetch and parse a single RSS feed, reusing cached stories when the server answers 304."""
     stories = []
+    cached = cache.get(url) if cache is not None else None
+    request_headers = {}
+    if cached and cached.get("etag"):
+        request_headers["If-None-Match"] = cached["etag"]
+    if cached and cached.get("modified"):
+        request_headers["If-Modified-Since"] = cached["modified"]
     try:
-        feed = feedparser.parse(url)
+        response = HTTP_CLIENT.get(url, headers=request_headers)
+        if cached and response.status_code == 304:
+            for s in cached["stories"]:
+                stories.append(make_story(
+                    s["title"], s["link"], s["description"], s["llm_body"],
+                    source_name, datetime.fromisoformat(s["date"]), now,
+                ))
+            log(f"  Fetched {source_name}: not modified, {len(stories)} cached entries")
+            return stories
+
+        response.raise_for_status()
+        # Content-Location lets feedparser resolve relative links against the final URL.
+        response_headers = dict(response.headers)
+        response_headers.setdefault("content-location", str(response.url))
+        feed = feedparser.parse(response.content, response_headers=response_headers)
+        # Only a feed's newest entries can make its category's cut, so date every entry
+        # first and skip HTML stripping for the rest. Dedup by link before capping
+        # (newest copy wins, as in fetch_category) so repeats don't eat into the cap.
+        dated: dict[str, tuple[datetime, feedparser.FeedParserDict]] = {}
         for entry in feed.entries:
-            link = entry.get("link", "")
+            link = entry.get("link")
             if not link:
                 continue
-
+            pub_date = parse_date(entry)
+            seen = dated.get(link)
+            if seen is None or pub_date > seen[0]:
+                dated[link] = (pub_date, entry)
+        for pub_date, entry in heapq.nlargest(MAX_STORIES_PER_CATEGORY, dated.values(), key=itemgetter(0)):
+            link = entry["link"]
             title = entry.get("title", "Untitled")
             description = strip_html(entry.get("summary", entry.get("description", "")))
             description = truncate(description, MAX_DESCRIPTION_LENGTH)
             llm_body = entry_llm_body(entry)
-            pub_date = parse_date(entry)
 
-            now = datetime.now(timezone.utc)
-            hours_old = (now - pub_date).total_seconds() / 3600
-            
-            stories.append({
-                "title": title,
-                "link": link,
-                "description": description,
-                "llm_body": llm_body,
-                "source": source_name,
-                "date": pub_date,
-                "date_str": pub_date.strftime("%b %d, %Y"),
-                "time_ago": time_ago(pub_date),
-                "is_new": hours_old < 6,
-                "hours_old": hours_old,
-            })
+            stories.append(make_story(title, link, description, llm_body, source_name, pub_date, now))
+
+        if cache is not None:
+            cache[url] = {
+                "etag": response.headers.get("etag"),
+                "modified": response.headers.get("last-modified"),
+                "stories": cache_stories(stories),
+            }
+        log(f"  Fetched {source_name}: {len(stories)} entries")
     except Exception as e:
-        print(f"Error fetching {source_name} ({url}): {e}")
+        log(f"Error fetching {source_name} ({url}): {e}")
 
     return stories
 
 
-def fetch_category(category: str) -> list[dict]:
-    """Fetch all feeds for a category and deduplicate."""
-    all_stories = []
-    seen_urls = set()
+def fetch_all_feeds(now: datetime) -> dict[str, list[list[Story]]]:
+    """Fetch every feed concurrently, grouped by category in FEEDS order."""
+    jobs = [(category, source_name, url) for category, sources in FEEDS.items() for source_name, url in sources]
+    print(f"Fetching {len(jobs)} feeds...")
+
+    # Each worker only touches its own URL's entry, so the dict is safe to share.
+    cache = load_feed_cache()
+    results: dict[str, list[list[Story]]] = {category: [] for category in FEEDS}
+    with ThreadPoolExecutor(max_workers=MAX_FETCH_WORKERS) as executor:
+        # map() yields in submission order, so dedup below stays deterministic.
+        fetched = executor.map(lambda job: fetch_feed(job[1], job[2], now, cache), jobs)
+        for (category, _, _), stories in zip(jobs, fetched):
+            results[category].append(stories)
+
+    save_feed_cache(cache)
+    return results
+
 
-    for source_name, url in FEEDS[category]:
-        print(f"  Fetching {source_name}...")
-        stories = fetch_feed(source_name, url)
+def fetch_category(category: str, feed_results: list[list[Story]]) -> list[Story]:
+    """Merge the fetched feeds for a category, keeping the newest copy of each link."""
+    by_link: dict[str, Story] = {}
+
+    for stories in feed_results:
         for story in stories:
-            if story["link"] not in seen_urls:
-                seen_urls.add(story["link"])
-                all_stories.append(story)
+            seen = by_link.get(story.link)
+            if seen is None or story.date > seen.date:
+                by_link[story.link] = story
 
-    all_stories.sort(key=lambda x: x["date"], reverse=True)
-    return all_stories[:MAX_STORIES_PER_CATEGORY]
+    return heapq.nlargest(MAX_STORIES_PER_CATEGORY, by_link.values(), key=attrgetter("date"))
 
 
 def build_site():
     """Main build function."""
     print("Building Tech Insights...")
+    # One timestamp for the whole build keeps ages and "new" badges consistent across feeds.
+    now = datetime.now(timezone.utc)
 
     categories_data = []
     all_stories = []
-    
+    feed_results = fetch_all_feeds(now)
+
     for category_id in ["ai", "devtools", "tech", "startups", "security"]:
         print(f"\nCategory: {CATEGORY_LABELS[category_id]}")
-        stories = fetch_category(category_id)
+        stories = fetch_category(category_id, feed_results[category_id])
         print(f"  Found {len(stories)} stories")
+        format_story_dates(stories, now)
         
         for story in stories:
-            story["category"] = category_id
-            story["category_label"] = CATEGORY_LABELS[category_id]
+            story.category = category_id
+            story.category_label = CATEGORY_LABELS[category_id]
         
         all_stories.extend(stories)
         categories_data.append({
@@ -241,21 +411,23 @@ def build_site():
             "stories": stories,
         })
 
-    all_stories.sort(key=lambda x: x["date"], reverse=True)
-
-    env = Environment(loader=FileSystemLoader(TEMPLATES_DIR))
+    JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    env = Environment(
+        loader=FileSystemLoader(TEMPLATES_DIR),
+        auto_reload=False,
+        bytecode_cache=FileSystemBytecodeCache(str(JINJA_CACHE_DIR)),
+    )
     template = env.get_template("page.html")
 
-    now = datetime.now(timezone.utc)
-    html_content = template.render(
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    output_file = OUTPUT_DIR / "index.html"
+    render_to_file(
+        template,
+        output_file,
         categories=categories_data,
         updated_at=now.strftime("%B %d, %Y at %H:%M UTC"),
         year=now.year,
     )
-
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
-    output_file = OUTPUT_DIR / "index.html"
-    output_file.write_text(html_content)
     print(f"\nGenerated {output_file}")
 
     generate_sitemap(now)
@@ -290,21 +462,27 @@ def generate_sitemap(now: datetime):
                 "priority": "0.6"
             })
     
-    sitemap = '<?xml version="1.0" encoding="UTF-8"?>\n'
-    sitemap += '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+    lastmod = now.strftime("%Y-%m-%d")
+    parts = [
+        '<?xml version="1.0" encoding="UTF-8"?>',
+        '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">',
+    ]
     
     for url in urls:
-        sitemap += "  <url>\n"
-        sitemap += f"    <loc>{url['loc']}</loc>\n"
-        sitemap += f"    <lastmod>{now.strftime('%Y-%m-%d')}</lastmod>\n"
-        sitemap += f"    <changefreq>{url['changefreq']}</changefreq>\n"
-        sitemap += f"    <priority>{url['priority']}</priority>\n"
-        sitemap += "  </url>\n"
+        parts.extend((
+            "  <url>",
+            f"    <loc>{url['loc']}</loc>",
+            f"    <lastmod>{lastmod}</lastmod>",
+            f"    <changefreq>{url['changefreq']}</changefreq>",
+            f"    <priority>{url['priority']}</priority>",
+            "  </url>",
+        ))
     
-    sitemap += "</urlset>"
+    parts.append("</urlset>")
+    sitemap = "\n".join(parts)
     
     sitemap_file = OUTPUT_DIR / "sitemap.xml"
-    sitemap_file.write_text(sitemap)
+    write_atomic(sitemap_file, sitemap.encode("utf-8"))
     print(f"Generated {sitemap_file}")
 
 
@@ -316,27 +494,26 @@ def generate_archive(env: Environment, now: datetime, all_stories: list):
     year, week_num, _ = now.isocalendar()
     week_id = f"week-{year}-{week_num:02d}"
     
-    week_stories = [s for s in all_stories if s["hours_old"] < 168]
-    week_stories.sort(key=lambda x: x["date"], reverse=True)
-    
-    seen = set()
-    unique_stories = []
-    for s in week_stories:
-        if s["link"] not in seen:
-            seen.add(s["link"])
-            unique_stories.append(s)
+    # A link listed under several categories keeps its newest copy (the first on ties).
+    week_stories: dict[str, Story] = {}
+    for s in all_stories:
+        if s.hours_old < ARCHIVE_WINDOW_HOURS:
+            seen = week_stories.get(s.link)
+            if seen is None or s.date > seen.date:
+                week_stories[s.link] = s
+    unique_stories = heapq.nlargest(MAX_ARCHIVE_STORIES, week_stories.values(), key=attrgetter("date"))
     
     template = env.get_template("archive.html")
-    html_content = template.render(
+    archive_file = archive_dir / f"{week_id}.html"
+    render_to_file(
+        template,
+        archive_file,
         week_id=week_id,
         week_label=f"Week {week_num}, {year}",
-        stories=unique_stories[:50],
+        stories=unique_stories,
         updated_at=now.strftime("%B %d, %Y"),
         year=now.year,
     )
-    
-    archive_file = archive_dir / f"{week_id}.html"
-    archive_file.write_text(html_content)
     print(f"Generated {archive_file}")
     
     weeks = []
@@ -347,8 +524,7 @@ def generate_archive(env: Environment, now: datetime, all_stories: list):
             weeks.append({"id": name, "label": f"Week {parts[1]}, {parts[0]}", "file": f"{name}.html"})
     
     index_template = env.get_template("archive_index.html")
-    index_content = index_template.render(weeks=weeks, year=now.year)
-    (archive_dir / "index.html").write_text(index_content)
+    render_to_file(index_template, archive_dir / "index.html", weeks=weeks, year=now.year)
     print(f"Generated {archive_dir}/index.html")
 
 
@@ -374,7 +550,7 @@ def generate_structured_data(now: datetime):
     }
     
     json_file = OUTPUT_DIR / "structured-data.json"
-    json_file.write_text(json.dumps(structured_data, indent=2))
+    write_atomic(json_file, json_dumps(structured_data, indent=True))
     print(f"Generated {json_file}")
 
 
@@ -389,7 +565,7 @@ def generate_rss_feed(now: datetime, all_stories: list):
             .replace('"', "&quot;")
             .replace("'", "&apos;"))
     
-    recent = sorted(all_stories, key=lambda x: x["date"], reverse=True)[:30]
+    recent = heapq.nlargest(MAX_RSS_ITEMS, all_stories, key=attrgetter("date"))
     
     rss = '<?xml version="1.0" encoding="UTF-8"?>\n'
     rss += '<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">\n'
@@ -403,21 +579,21 @@ def generate_rss_feed(now: datetime, all_stories: list):
     
     for story in recent:
         rss += '  <item>\n'
-        rss += f'    <title>{escape_xml(story["title"])}</title>\n'
-        rss += f'    <link>{escape_xml(story["link"])}</link>\n'
-        rss += f'    <guid>{escape_xml(story["link"])}</guid>\n'
-        rss += f'    <pubDate>{story["date"].strftime("%a, %d %b %Y %H:%M:%S +0000")}</pubDate>\n'
-        rss += f'    <source url="{SITE_URL}/">{escape_xml(story["source"])}</source>\n'
-        if story.get("description"):
-            rss += f'    <description>{escape_xml(story["description"])}</description>\n'
-        rss += f'    <category>{escape_xml(story["category_label"])}</category>\n'
+        rss += f'    <title>{escape_xml(story.title)}</title>\n'
+        rss += f'    <link>{escape_xml(story.link)}</link>\n'
+        rss += f'    <guid>{escape_xml(story.link)}</guid>\n'
+        rss += f'    <pubDate>{story.date.strftime("%a, %d %b %Y %H:%M:%S +0000")}</pubDate>\n'
+        rss += f'    <source url="{SITE_URL}/">{escape_xml(story.source)}</source>\n'
+        if story.description:
+            rss += f'    <description>{escape_xml(story.description)}</description>\n'
+        rss += f'    <category>{escape_xml(story.category_label)}</category>\n'
         rss += '  </item>\n'
     
     rss += '</channel>\n'
     rss += '</rss>'
     
     feed_file = OUTPUT_DIR / "feed.xml"
-    feed_file.write_text(rss)
+    write_atomic(feed_file, rss.encode("utf-8"))
     print(f"Generated {feed_file}")
 
 
@@ -429,14 +605,14 @@ def generate_category_pages(env: Environment, now: datetime, categories_data: li
         cat_dir = OUTPUT_DIR / category["id"]
         cat_dir.mkdir(exist_ok=True)
         
-        html_content = template.render(
+        output_file = cat_dir / "index.html"
+        render_to_file(
+            template,
+            output_file,
             category=category,
             updated_at=now.strftime("%B %d, %Y at %H:%M UTC"),
             year=now.year,
         )
-        
-        output_file = cat_dir / "index.html"
-        output_file.write_text(html_content)
         print(f"Generated {output_file}")
 
 